@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 import os
-import re
 import sys
 import time
 import csv
+import functools
 import subprocess
 from dataclasses import dataclass, asdict
-from typing import Optional, Tuple, Dict, List
+from typing import Any, Optional, Tuple, Dict, List
 
 from rich.console import Console
 from rich.panel import Panel
@@ -17,6 +17,15 @@ from rich.text import Text
 
 console = Console()
 
+# bytes read from the start of a .cnf when looking for the "p cnf" header
+DIMACS_HEADER_PROBE_BYTES = 8192
+
+CSV_HEADER = [
+    "timestamp", "benchmark", "vars", "clauses",
+    "result", "cpu_time_s", "conflicts", "decisions", "propagations",
+    "decisions_per_sec", "props_per_sec", "conflicts_per_sec", "ns_per_prop", "ns_per_decision"
+]
+
 @dataclass
 class DimacsInfo:
     vars: Optional[int] = None
@@ -37,19 +46,85 @@ class MiniSatStats:
     ns_per_decision: Optional[float] = None
 
 def parse_dimacs_header(path: str) -> DimacsInfo:
-    info = DimacsInfo()
+    # cache key includes mtime/size, so an edited .cnf is re-read
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.startswith("p cnf"):
-                    parts = line.strip().split()
-                    if len(parts) >= 4:
-                        info.vars = int(parts[2])
-                        info.clauses = int(parts[3])
-                    break
+        st = os.stat(path)
+    except OSError:
+        return DimacsInfo()
+    vars_, clauses = _parse_dimacs_header_cached(path, st.st_mtime_ns, st.st_size)
+    return DimacsInfo(vars=vars_, clauses=clauses)
+
+@functools.lru_cache(maxsize=512)
+def _parse_dimacs_header_cached(path: str, mtime_ns: int, size: int) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        with open(path, "rb") as f:
+            # the "p cnf" line sits after a few comment lines: try a small prefix
+            head = f.read(DIMACS_HEADER_PROBE_BYTES)
+            lines = head.splitlines()
+            truncated = len(head) == DIMACS_HEADER_PROBE_BYTES
+            if truncated and not head.endswith(b"\n"):
+                lines.pop()  # last line may be cut
+            for line in lines:
+                if line.startswith(b"p cnf"):
+                    return _dimacs_counts(line)
+            if truncated:
+                f.seek(0)
+                for line in f:
+                    if line.startswith(b"p cnf"):
+                        return _dimacs_counts(line)
     except Exception:
         pass
-    return info
+    return None, None
+
+def _dimacs_counts(line: bytes) -> Tuple[Optional[int], Optional[int]]:
+    parts = line.split()
+    if len(parts) >= 4:
+        return int(parts[2]), int(parts[3])
+    return None, None
+
+def _stat_value(rhs: str, conv):
+    # first token after ':' (e.g. "  6.99 sec" -> 6.99)
+    parts = rhs.split(None, 1)
+    if not parts:
+        return None
+    tok = parts[0]
+    if "," in tok:  # MiniSat's default output has no thousands separators
+        tok = tok.replace(",", "")
+    try:
+        return conv(tok)
+    except ValueError:
+        return None
+
+# MiniSat summary lines, e.g. "conflicts         : 1234  (56 / sec)"
+_STAT_LINES = {
+    "CPU time": ("cpu_time_s", float),
+    "conflicts": ("conflicts", int),
+    "decisions": ("decisions", int),
+    "propagations": ("propagations", int),
+}
+
+def _scan_stats(text: str) -> Dict[str, Any]:
+    found: Dict[str, Any] = {}
+    for line in text.splitlines():
+        label, sep, rhs = line.partition(":")
+        if not sep:
+            continue
+        spec = _STAT_LINES.get(label.strip())
+        if spec is not None and found.get(spec[0]) is None:
+            found[spec[0]] = _stat_value(rhs, spec[1])
+    return found
+
+def _find_stats(text: str) -> Dict[str, Any]:
+    # printStats' block starts with "restarts" and ends at the blank line before
+    # the result (the SAT model line, possibly huge, comes after it); scan just
+    # that block, fall back to the whole text
+    start = text.rfind("\nrestarts")
+    if start >= 0:
+        end = text.find("\n\n", start + 1)
+        found = _scan_stats(text[start:end] if end >= 0 else text[start:])
+        if all(found.get(key) is not None for key, _ in _STAT_LINES.values()):
+            return found
+    return _scan_stats(text)
 
 def parse_minisat_output(out: str) -> MiniSatStats:
     s = MiniSatStats()
@@ -60,26 +135,16 @@ def parse_minisat_output(out: str) -> MiniSatStats:
     elif "SATISFIABLE" in out:
         s.result = "SATISFIABLE"
 
-    # Common MiniSat lines (depending on version/flags)
+    # Common MiniSat lines (depending on version/flags), one metric per line:
     # CPU time              : 0.12 s
-    m = re.search(r"CPU time\s*:\s*([0-9]*\.?[0-9]+)\s*s", out)
-    if m:
-        s.cpu_time_s = float(m.group(1))
-
     # conflicts             : 1234
-    m = re.search(r"conflicts\s*:\s*([0-9,]+)", out)
-    if m:
-        s.conflicts = int(m.group(1).replace(",", ""))
-
     # decisions             : 12345
-    m = re.search(r"decisions\s*:\s*([0-9,]+)", out)
-    if m:
-        s.decisions = int(m.group(1).replace(",", ""))
-
     # propagations          : 1234567
-    m = re.search(r"propagations\s*:\s*([0-9,]+)", out)
-    if m:
-        s.propagations = int(m.group(1).replace(",", ""))
+    found = _find_stats(out)
+    s.cpu_time_s = found.get("cpu_time_s")
+    s.conflicts = found.get("conflicts")
+    s.decisions = found.get("decisions")
+    s.propagations = found.get("propagations")
 
     # derived
     if s.cpu_time_s and s.cpu_time_s > 0:
@@ -94,16 +159,17 @@ def parse_minisat_output(out: str) -> MiniSatStats:
 
     return s
 
-def run_minisat(exec_path: str, cnf_path: str) -> Tuple[int, str, str]:
+def run_minisat(exec_path: str, cnf_path: str) -> Tuple[int, str]:
     # Minisat usage typically: minisat <input.cnf> [output]
+    # stderr is merged into stdout (single pipe, already in output order)
     proc = subprocess.Popen(
         [exec_path, cnf_path],
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
         text=True
     )
-    out, err = proc.communicate()
-    return proc.returncode, out, err
+    out, _ = proc.communicate()
+    return proc.returncode, out
 
 def human_int(x: Optional[int]) -> str:
     if x is None:
@@ -135,15 +201,11 @@ def build_metrics_table(stats: MiniSatStats) -> Table:
     return t
 
 def append_csv(csv_path: str, cnf: str, dimacs: DimacsInfo, stats: MiniSatStats) -> None:
-    is_new = not os.path.exists(csv_path)
     with open(csv_path, "a", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        if is_new:
-            w.writerow([
-                "timestamp", "benchmark", "vars", "clauses",
-                "result", "cpu_time_s", "conflicts", "decisions", "propagations",
-                "decisions_per_sec", "props_per_sec", "conflicts_per_sec", "ns_per_prop", "ns_per_decision"
-            ])
+        # append mode starts at end of file: position 0 means new/empty file
+        if f.tell() == 0:
+            w.writerow(CSV_HEADER)
         w.writerow([
             int(time.time()), os.path.basename(cnf), dimacs.vars, dimacs.clauses,
             stats.result, stats.cpu_time_s, stats.conflicts, stats.decisions, stats.propagations,
@@ -157,8 +219,8 @@ def main():
         console.print("[red]Nu găsesc executabilul ./minisat în folderul curent.[/red]")
         sys.exit(1)
 
-    cnfs = [f for f in os.listdir(folder) if f.endswith(".cnf")]
-    cnfs.sort()
+    with os.scandir(folder) as it:
+        cnfs = sorted(e.name for e in it if e.name.endswith(".cnf") and e.is_file())
     if not cnfs:
         console.print("[yellow]Nu am găsit fișiere .cnf în folder. Pune benchmark-urile aici.[/yellow]")
         sys.exit(1)
@@ -203,15 +265,12 @@ def main():
     layout["bottom"].update(Panel("Waiting for results...", title="Metrics", border_style="yellow"))
 
     with Live(layout, refresh_per_second=10, screen=True):
-        rc, out, err = run_minisat(exec_path, cnf_path)
+        rc, out = run_minisat(exec_path, cnf_path)
         log_text = Text()
         log_text.append(out if out else "", style="white")
-        if err:
-            log_text.append("\n[stderr]\n", style="bold red")
-            log_text.append(err, style="red")
         layout["log"].update(Panel(log_text, title=f"MiniSat Output (rc={rc})", border_style="magenta"))
 
-        stats = parse_minisat_output(out + "\n" + err)
+        stats = parse_minisat_output(out)
         layout["bottom"].update(Panel(build_metrics_table(stats), border_style="yellow"))
 
         append_csv("results.csv", cnf, dimacs, stats)
@@ -1,23 +1,40 @@
 import os
-import re
 import time
 import csv
+import functools
+import hashlib
+import itertools
+import select
 import uuid
 import shutil
 import threading
 import subprocess
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from typing import Dict, Optional, List, Any
 
-from fastapi import FastAPI, Query
-from fastapi.responses import FileResponse, JSONResponse
+import fastapi
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+# orjson (optional) serializes the large poll payloads (log) much faster.
+# only used on FastAPI < 0.143: ORJSONResponse is deprecated from that release on
+# (FastAPIDeprecationWarning), and there the plain JSONResponse is kept.
+try:
+    import orjson  # noqa: F401
+    if tuple(int(p) for p in fastapi.__version__.split(".")[:2]) >= (0, 143):
+        raise ImportError("ORJSONResponse deprecated")
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 BUILD_DIR = os.path.join(APP_DIR, "build")
 RESULTS_CSV = os.path.join(APP_DIR, "results.csv")
 
-app = FastAPI()
+app = FastAPI(default_response_class=DefaultResponse)
 app.mount("/static", StaticFiles(directory=os.path.join(APP_DIR, "static")), name="static")
 
 # ========= Variants (baseline + variant2) =========
@@ -39,25 +56,194 @@ VARIANTS = {
 }
 
 # runtime storage
-runs: Dict[str, Dict[str, Any]] = {}       # run_id -> {status, log, stats, meta}
-compares: Dict[str, Dict[str, Any]] = {}   # compare_id -> {status, ...}
+# Workers only append to log_lines and assign whole fields (stats/result
+# before status), so polls can read a state without taking a lock.
+# Every visible change then sets a new `version` (used as the poll ETag).
+_versions = itertools.count(1)
+
+class _Versioned:
+    def touch(self):
+        # next() on itertools.count is atomic, so concurrent writers never share a version
+        self.version = next(_versions)
+
+    def set_status(self, status: str):
+        self.status = status
+        self.touch()
+
+    def append_log(self, text: str):
+        self.log_lines.append(text)
+        self.touch()
+
+    def log_to(self, lines: List[str]):
+        # on_line callback for run_minisat_stream
+        def on_line(text: str):
+            lines.append(text)
+            self.touch()
+        return on_line
+
+@dataclass
+class RunState(_Versioned):
+    meta: Dict[str, Any]
+    status: str = "QUEUED"
+    log_lines: List[str] = field(default_factory=list)
+    stats: Optional[Dict] = None
+    version: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"status": self.status, "log": "".join(self.log_lines), "stats": self.stats, "meta": self.meta}
+
+@dataclass
+class CompareState(_Versioned):
+    meta: Dict[str, Any]
+    status: str = "QUEUED"
+    log_lines: List[str] = field(default_factory=list)   # build/server messages
+    log_a: Optional[List[str]] = None                     # set when A starts
+    log_b: Optional[List[str]] = None                     # set when B starts
+    result: Optional[Dict] = None
+    version: int = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        parts: List[str] = []
+        if self.log_a is not None:
+            parts += ["Running A...\n", "".join(self.log_a)]
+        if self.log_b is not None:
+            parts += ["\n\nRunning B...\n", "".join(self.log_b)]
+        parts += self.log_lines
+        return {"status": self.status, "log": "".join(parts), "meta": self.meta, "result": self.result}
+
+runs: Dict[str, RunState] = {}
+compares: Dict[str, CompareState] = {}
+
+# background runs/compares; each MiniSat process keeps a core busy, so at
+# most MAX_JOBS solve at once (extra submissions wait as QUEUED). Jobs run on
+# daemon threads: stopping the server does not wait for running/queued solves.
+MAX_JOBS = max(1, (os.cpu_count() or 2) // 2)
+_job_slots = threading.BoundedSemaphore(MAX_JOBS)
+
+def start_daemon(fn, *args) -> Future:
+    fut: Future = Future()
+    def target():
+        if not fut.set_running_or_notify_cancel():
+            return
+        try:
+            fut.set_result(fn(*args))
+        except BaseException as e:
+            fut.set_exception(e)
+    threading.Thread(target=target, daemon=True).start()
+    return fut
+
+def submit_job(fn, *args) -> Future:
+    def job():
+        with _job_slots:
+            return fn(*args)
+    return start_daemon(job)
+
+# bytes read from the start of a .cnf when looking for the "p cnf" header
+DIMACS_HEADER_PROBE_BYTES = 8192
+
+# streamed solver output is handed to the log at most this often
+LOG_FLUSH_INTERVAL_S = 0.05
+# max bytes taken from the solver pipe per read
+STREAM_READ_BYTES = 65536
+
+# optional CPU pinning of the solver (?pin=N) is done by prefixing argv with
+# taskset, not with a preexec_fn: without preexec_fn CPython starts the child
+# via vfork/posix_spawn instead of a full fork() of this process
+TASKSET = shutil.which("taskset")
+
+# results.csv stays open for the server's lifetime (opened on first row)
+CSV_HEADER = [
+    "timestamp", "benchmark", "vars", "clauses",
+    "variant_key", "variant_label",
+    "result", "cpu_time_s", "conflicts", "decisions", "propagations",
+    "decisions_per_sec", "props_per_sec", "conflicts_per_sec", "ns_per_prop", "ns_per_decision"
+]
+_csv_lock = threading.Lock()
+_csv_fp = None
+_csv_writer = None
 
 # ========= Helpers =========
 
-def parse_dimacs_header(path: str):
-    vars_, clauses = None, None
+def parse_dimacs_header(path: str, st: Optional[os.stat_result] = None):
+    # cache key includes mtime/size, so an edited .cnf is re-read
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, None
+    return _parse_dimacs_header_cached(path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=512)
+def _parse_dimacs_header_cached(path: str, mtime_ns: int, size: int):
     try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.startswith("p cnf"):
-                    parts = line.strip().split()
-                    if len(parts) >= 4:
-                        vars_ = int(parts[2])
-                        clauses = int(parts[3])
-                    break
+        with open(path, "rb") as f:
+            # the "p cnf" line sits after a few comment lines: try a small prefix
+            head = f.read(DIMACS_HEADER_PROBE_BYTES)
+            lines = head.splitlines()
+            truncated = len(head) == DIMACS_HEADER_PROBE_BYTES
+            if truncated and not head.endswith(b"\n"):
+                lines.pop()  # last line may be cut
+            for line in lines:
+                if line.startswith(b"p cnf"):
+                    return _dimacs_counts(line)
+            if truncated:
+                f.seek(0)
+                for line in f:
+                    if line.startswith(b"p cnf"):
+                        return _dimacs_counts(line)
     except Exception:
         pass
-    return vars_, clauses
+    return None, None
+
+def _dimacs_counts(line: bytes):
+    parts = line.split()
+    if len(parts) >= 4:
+        return int(parts[2]), int(parts[3])
+    return None, None
+
+def _stat_value(rhs: str, conv):
+    # first token after ':' (e.g. "  6.99 sec" -> 6.99)
+    parts = rhs.split(None, 1)
+    if not parts:
+        return None
+    tok = parts[0]
+    if "," in tok:  # MiniSat's default output has no thousands separators
+        tok = tok.replace(",", "")
+    try:
+        return conv(tok)
+    except ValueError:
+        return None
+
+# MiniSat summary lines, e.g. "conflicts         : 1234  (56 / sec)"
+_STAT_LINES = {
+    "CPU time": ("cpu_time_s", float),
+    "conflicts": ("conflicts", int),
+    "decisions": ("decisions", int),
+    "propagations": ("propagations", int),
+}
+
+def _scan_stats(text: str) -> Dict[str, Any]:
+    found: Dict[str, Any] = {}
+    for line in text.splitlines():
+        label, sep, rhs = line.partition(":")
+        if not sep:
+            continue
+        spec = _STAT_LINES.get(label.strip())
+        if spec is not None and found.get(spec[0]) is None:
+            found[spec[0]] = _stat_value(rhs, spec[1])
+    return found
+
+def _find_stats(text: str) -> Dict[str, Any]:
+    # printStats' block starts with "restarts" and ends at the blank line before
+    # the result (the SAT model line, possibly huge, comes after it); scan just
+    # that block, fall back to the whole text
+    start = text.rfind("\nrestarts")
+    if start >= 0:
+        end = text.find("\n\n", start + 1)
+        found = _scan_stats(text[start:end] if end >= 0 else text[start:])
+        if all(found.get(key) is not None for key, _ in _STAT_LINES.values()):
+            return found
+    return _scan_stats(text)
 
 def parse_minisat_output(text: str):
     result = "UNKNOWN"
@@ -66,22 +252,11 @@ def parse_minisat_output(text: str):
     elif "SATISFIABLE" in text:
         result = "SATISFIABLE"
 
-    def find_int(pattern: str) -> Optional[int]:
-        m = re.search(pattern, text)
-        if not m:
-            return None
-        return int(m.group(1).replace(",", ""))
-
-    def find_float(pattern: str) -> Optional[float]:
-        m = re.search(pattern, text)
-        if not m:
-            return None
-        return float(m.group(1))
-
-    cpu = find_float(r"CPU time\s*:\s*([0-9]*\.?[0-9]+)\s*s")
-    conflicts = find_int(r"conflicts\s*:\s*([0-9,]+)")
-    decisions = find_int(r"decisions\s*:\s*([0-9,]+)")
-    props = find_int(r"propagations\s*:\s*([0-9,]+)")
+    found = _find_stats(text)
+    cpu = found.get("cpu_time_s")
+    conflicts = found.get("conflicts")
+    decisions = found.get("decisions")
+    props = found.get("propagations")
 
     stats = {
         "result": result,
@@ -108,25 +283,29 @@ def parse_minisat_output(text: str):
 
     return stats
 
+def _get_csv_writer():
+    # caller holds _csv_lock
+    global _csv_fp, _csv_writer
+    if _csv_writer is None:
+        _csv_fp = open(RESULTS_CSV, "a", newline="", encoding="utf-8", buffering=1)
+        _csv_writer = csv.writer(_csv_fp)
+        # append mode starts at end of file: position 0 means new/empty file
+        if _csv_fp.tell() == 0:
+            _csv_writer.writerow(CSV_HEADER)
+    return _csv_writer
+
 def append_csv(benchmark: str, vars_: Optional[int], clauses: Optional[int], variant_key: str, variant_label: str, stats: Dict):
-    is_new = not os.path.exists(RESULTS_CSV)
-    with open(RESULTS_CSV, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if is_new:
-            w.writerow([
-                "timestamp", "benchmark", "vars", "clauses",
-                "variant_key", "variant_label",
-                "result", "cpu_time_s", "conflicts", "decisions", "propagations",
-                "decisions_per_sec", "props_per_sec", "conflicts_per_sec", "ns_per_prop", "ns_per_decision"
-            ])
-        w.writerow([
-            int(time.time()), benchmark, vars_, clauses,
-            variant_key, variant_label,
-            stats.get("result"), stats.get("cpu_time_s"), stats.get("conflicts"),
-            stats.get("decisions"), stats.get("propagations"),
-            stats.get("decisions_per_sec"), stats.get("props_per_sec"),
-            stats.get("conflicts_per_sec"), stats.get("ns_per_prop"), stats.get("ns_per_decision")
-        ])
+    row = [
+        int(time.time()), benchmark, vars_, clauses,
+        variant_key, variant_label,
+        stats.get("result"), stats.get("cpu_time_s"), stats.get("conflicts"),
+        stats.get("decisions"), stats.get("propagations"),
+        stats.get("decisions_per_sec"), stats.get("props_per_sec"),
+        stats.get("conflicts_per_sec"), stats.get("ns_per_prop"), stats.get("ns_per_decision")
+    ]
+    with _csv_lock:
+        _get_csv_writer().writerow(row)
+        _csv_fp.flush()
 
 def safe_rm_tree(path: str):
     if os.path.exists(path):
@@ -145,41 +324,69 @@ def copy_project_sources(dst_dir: str, solver_src_name: str) -> Optional[str]:
     if not os.path.exists(solver_src_path):
         return f"Lipsește fișierul: {solver_src_name}"
 
-    # copy Makefile + depend.mak if exists
-    for fname in ["Makefile", "depend.mak"]:
-        src = os.path.join(APP_DIR, fname)
-        if os.path.exists(src):
-            shutil.copy2(src, os.path.join(dst_dir, fname))
-
-    # copy headers
+    # one listing: Makefile + depend.mak if exists, headers, .c excluding solver*.c
+    # (copyfile: build tree needs contents only, not copied metadata)
+    to_copy = []
     for fname in os.listdir(APP_DIR):
-        if fname.endswith(".h"):
-            shutil.copy2(os.path.join(APP_DIR, fname), os.path.join(dst_dir, fname))
+        if fname in ("Makefile", "depend.mak") or fname.endswith(".h"):
+            to_copy.append(fname)
+        elif fname.endswith(".c") and not fname.startswith("solver"):
+            # exclude solver.c, solver2.c, solverX.c etc.
+            to_copy.append(fname)
 
-    # copy .c excluding solver*.c
-    for fname in os.listdir(APP_DIR):
-        if fname.endswith(".c"):
-            if fname.startswith("solver") and fname.endswith(".c"):
-                # exclude solver.c, solver2.c, solverX.c etc.
-                continue
-            shutil.copy2(os.path.join(APP_DIR, fname), os.path.join(dst_dir, fname))
+    for fname in to_copy:
+        shutil.copyfile(os.path.join(APP_DIR, fname), os.path.join(dst_dir, fname))
 
     # copy chosen solver as solver.c
-    shutil.copy2(solver_src_path, os.path.join(dst_dir, "solver.c"))
+    shutil.copyfile(solver_src_path, os.path.join(dst_dir, "solver.c"))
     return None
 
+def source_fingerprint(solver_src_name: str) -> Optional[str]:
+    """
+    Amprenta intrărilor unui build: nume + mtime + size pentru fișierele
+    copiate de copy_project_sources și conținutul solverului ales.
+    None dacă solverul lipsește.
+    """
+    solver_src_path = os.path.join(APP_DIR, solver_src_name)
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        for fname in sorted(os.listdir(APP_DIR)):
+            if fname in ("Makefile", "depend.mak") or fname.endswith(".h") or \
+                    (fname.endswith(".c") and not fname.startswith("solver")):
+                st = os.stat(os.path.join(APP_DIR, fname))
+                h.update(f"{fname}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+        with open(solver_src_path, "rb") as f:
+            h.update(f.read())
+    except OSError:
+        return None
+    return h.hexdigest()
+
+# one lock per variant: concurrent jobs must not check/wipe/rebuild the same build dir together
+_build_locks = {k: threading.Lock() for k in VARIANTS}
+
 def ensure_built(variant_key: str, force_rebuild: bool = False) -> Optional[str]:
     if variant_key not in VARIANTS:
         return "Variant invalid."
 
-    v = VARIANTS[variant_key]
+    with _build_locks[variant_key]:
+        return _build_variant(VARIANTS[variant_key], force_rebuild)
+
+def _build_variant(v: Dict[str, Any], force_rebuild: bool) -> Optional[str]:
+    # caller holds the variant's _build_locks entry
     bdir = v["build_dir"]
     target = v["target"]
     make_target = v["make_target"]
 
     exe_path = os.path.join(bdir, target)
-    if (not force_rebuild) and os.path.exists(exe_path):
-        return None
+    fp_path = os.path.join(bdir, ".fingerprint")
+    fingerprint = source_fingerprint(v["solver_src"])
+    if (not force_rebuild) and fingerprint and os.path.exists(exe_path):
+        try:
+            with open(fp_path, "r", encoding="utf-8") as f:
+                if f.read().strip() == fingerprint:
+                    return None
+        except OSError:
+            pass
 
     # rebuild: clean folder
     safe_rm_tree(bdir)
@@ -198,24 +405,112 @@ def ensure_built(variant_key: str, force_rebuild: bool = False) -> Optional[str]
 
         if not os.path.exists(exe_path):
             return f"Build ok, dar nu găsesc executabilul {target} în {bdir}"
+        if fingerprint:
+            with open(fp_path, "w", encoding="utf-8") as f:
+                f.write(fingerprint)
         return None
     except Exception as e:
         return str(e)
 
-def run_minisat_stream(exe_path: str, cnf_path: str, on_line):
+def check_pin(*cpus: Optional[int]) -> Optional[str]:
+    for cpu in cpus:
+        if cpu is None:
+            continue
+        if TASKSET is None or not hasattr(os, "sched_getaffinity"):
+            return "Pinning indisponibil (necesită Linux și taskset)."
+        if cpu not in os.sched_getaffinity(0):
+            return f"CPU {cpu} indisponibil pentru pinning."
+    return None
+
+def run_minisat_stream(exe_path: str, cnf_path: str, on_line, pin: Optional[int] = None):
+    """
+    Rulează minisat și apelează on_line(text) cu liniile noi (doar ce s-a
+    adăugat, nu tot logul), grupate la cel mult LOG_FLUSH_INTERVAL_S.
+    Liniile nu așteaptă după output viitor: dacă solverul tace, ce e
+    în așteptare e publicat după cel mult LOG_FLUSH_INTERVAL_S.
+    Ce a rămas netrimis e livrat la final, după proc.wait().
+
+    Output-ul e citit binar, în bucăți de până la STREAM_READ_BYTES, și
+    decodat o singură dată pentru toate liniile complete din bucată.
+
+    pin=N rulează solverul fixat pe CPU N (taskset -c N), pentru timpi
+    mai reproductibili; validat în prealabil cu check_pin.
+    """
+    argv = [exe_path, cnf_path]
+    if pin is not None:
+        argv = [TASKSET, "-c", str(pin)] + argv
     proc = subprocess.Popen(
-        [exe_path, cnf_path],
+        argv,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
+        bufsize=0
     )
-    output_lines: List[str] = []
-    for line in proc.stdout:
-        output_lines.append(line)
-        on_line("".join(output_lines))
+    fd = proc.stdout.fileno()
+    output_chunks: List[str] = []
+    pending: List[str] = []
+    partial = bytearray()  # unfinished last line, grown in place
+    last = time.monotonic()
+    while True:
+        if pending:
+            # wait for more output only until the pending text is due
+            timeout = max(0.0, LOG_FLUSH_INTERVAL_S - (time.monotonic() - last))
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                on_line("".join(pending))
+                pending.clear()
+                last = time.monotonic()
+                continue
+        # os.read returns whatever is available, so slow output still streams
+        data = os.read(fd, STREAM_READ_BYTES)
+        if not data:
+            break
+        # only the new chunk is searched; long lines (e.g. the SAT model) stay linear
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            partial += data
+            continue
+        partial += data[:cut]
+        text = partial.decode("utf-8", "replace")
+        partial = bytearray(data[cut:])
+        output_chunks.append(text)
+        pending.append(text)
+        now = time.monotonic()
+        if now - last > LOG_FLUSH_INTERVAL_S:
+            on_line("".join(pending))
+            pending.clear()
+            last = now
+    if partial:
+        text = partial.decode("utf-8", "replace")
+        output_chunks.append(text)
+        pending.append(text)
+    proc.stdout.close()
     rc = proc.wait()
-    return rc, "".join(output_lines)
+    if pending:
+        on_line("".join(pending))
+    return rc, "".join(output_chunks)
+
+def poll_response(state: _Versioned, request: Request, since: Optional[int] = None):
+    """
+    Răspunsul pentru poll: ETag W/"<version>", 304 dacă clientul are deja
+    versiunea curentă. Cu since=N, în loc de "log" trimite doar
+    "log_delta" (logul de la caracterul N) și "log_len".
+    """
+    version = state.version  # read before the snapshot: content is at least this version
+    etag = f'W/"{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    snap = state.snapshot()
+    snap["version"] = version
+    if since is not None:
+        log = snap.pop("log")
+        snap["log_len"] = len(log)
+        snap["log_delta"] = log[since:]
+    return DefaultResponse(snap, headers={"ETag": etag})
+
+def compare_pins(pin: Optional[int], parallel: bool):
+    if pin is None:
+        return None, None
+    return pin, (pin + 1 if parallel else pin)
 
 def compute_compare_delta(a_stats: Dict, b_stats: Dict):
     """
@@ -240,25 +535,24 @@ def compute_compare_delta(a_stats: Dict, b_stats: Dict):
 
 # ========= Background tasks =========
 
-def run_task(run_id: str, variant_key: str, benchmark: str, cnf_path: str, vars_: Optional[int], clauses: Optional[int]):
+def run_task(run_id: str, variant_key: str, benchmark: str, cnf_path: str, vars_: Optional[int], clauses: Optional[int], pin: Optional[int] = None):
+    rs = runs[run_id]
     try:
+        rs.set_status("RUNNING")
         err = ensure_built(variant_key)
         if err:
-            runs[run_id]["status"] = "ERROR"
-            runs[run_id]["log"] += f"[build error] {err}\n"
+            rs.append_log(f"[build error] {err}\n")
+            rs.set_status("ERROR")
             return
 
         exe_path = os.path.join(VARIANTS[variant_key]["build_dir"], VARIANTS[variant_key]["target"])
 
-        def on_line(full_log: str):
-            runs[run_id]["log"] = full_log
-
-        rc, full = run_minisat_stream(exe_path, cnf_path, on_line)
+        rc, full = run_minisat_stream(exe_path, cnf_path, rs.log_to(rs.log_lines), pin)
         stats = parse_minisat_output(full)
 
-        runs[run_id]["stats"] = stats
-        runs[run_id]["status"] = "DONE"
-        runs[run_id]["meta"]["exit_code"] = rc
+        rs.meta["exit_code"] = rc
+        rs.stats = stats
+        rs.set_status("DONE")
 
         append_csv(
             benchmark, vars_, clauses,
@@ -266,54 +560,71 @@ def run_task(run_id: str, variant_key: str, benchmark: str, cnf_path: str, vars_
             stats
         )
     except Exception as e:
-        runs[run_id]["status"] = "ERROR"
-        runs[run_id]["log"] += f"\n[server error] {e}\n"
+        rs.append_log(f"\n[server error] {e}\n")
+        rs.set_status("ERROR")
 
-def compare_task(compare_id: str, benchmark: str, cnf_path: str, vars_: Optional[int], clauses: Optional[int], a: str, b: str):
+def compare_task(compare_id: str, benchmark: str, cnf_path: str, vars_: Optional[int], clauses: Optional[int], a: str, b: str, parallel: bool = True, pin: Optional[int] = None):
+    """
+    parallel=True rulează A și B simultan (wall-clock ~ max(A, B));
+    parallel=False păstrează rularea secvențială A apoi B, cu timpi
+    neinfluențați de celălalt proces.
+    pin=N fixează A pe CPU N și B pe N+1 (paralel) sau tot pe N (secvențial).
+    """
+    pin_a, pin_b = compare_pins(pin, parallel)
+    cs = compares[compare_id]
     try:
         # ensure builds (in advance)
         ea = ensure_built(a)
         eb = ensure_built(b)
         if ea or eb:
-            compares[compare_id]["status"] = "ERROR"
-            compares[compare_id]["log"] = f"[build error]\nA: {ea}\nB: {eb}\n"
+            cs.append_log(f"[build error]\nA: {ea}\nB: {eb}\n")
+            cs.set_status("ERROR")
             return
 
-        compares[compare_id]["status"] = "RUNNING"
-        compares[compare_id]["log"] = "Running A...\n"
-
-        # Run A
+        cs.set_status("RUNNING")
         exe_a = os.path.join(VARIANTS[a]["build_dir"], VARIANTS[a]["target"])
-        def on_line_a(full):
-            compares[compare_id]["log"] = "Running A...\n" + full
-        rc_a, out_a = run_minisat_stream(exe_a, cnf_path, on_line_a)
-        stats_a = parse_minisat_output(out_a)
+        exe_b = os.path.join(VARIANTS[b]["build_dir"], VARIANTS[b]["target"])
 
-        compares[compare_id]["log"] = compares[compare_id]["log"] + "\nRunning B...\n"
+        # once a variant finishes, its log becomes the single joined string,
+        # so polls don't re-join the finished part while the other streams
+        if parallel:
+            cs.log_a, cs.log_b = [], []
+            cs.touch()
+            # daemon threads (like the jobs themselves), not a pool joined at exit
+            fut_a = start_daemon(run_minisat_stream, exe_a, cnf_path, cs.log_to(cs.log_a), pin_a)
+            fut_b = start_daemon(run_minisat_stream, exe_b, cnf_path, cs.log_to(cs.log_b), pin_b)
+            rc_a, out_a = fut_a.result()
+            cs.log_a = [out_a]
+            rc_b, out_b = fut_b.result()
+            cs.log_b = [out_b]
+        else:
+            cs.log_a = []
+            cs.touch()
+            rc_a, out_a = run_minisat_stream(exe_a, cnf_path, cs.log_to(cs.log_a), pin_a)
+            cs.log_a = [out_a]
+            cs.log_b = []
+            cs.touch()
+            rc_b, out_b = run_minisat_stream(exe_b, cnf_path, cs.log_to(cs.log_b), pin_b)
 
-        # Run B
-        exe_b = os.path.join(VARIANTS[b]["build_dir"], VARIANTS[b]["target"])
-        def on_line_b(full):
-            compares[compare_id]["log"] = "Running A...\n" + out_a + "\n\nRunning B...\n" + full
-        rc_b, out_b = run_minisat_stream(exe_b, cnf_path, on_line_b)
+        stats_a = parse_minisat_output(out_a)
         stats_b = parse_minisat_output(out_b)
 
         delta = compute_compare_delta(stats_a, stats_b)
 
-        compares[compare_id]["status"] = "DONE"
-        compares[compare_id]["result"] = {
+        cs.result = {
             "a": {"key": a, "label": VARIANTS[a]["label"], "exit_code": rc_a, "stats": stats_a},
             "b": {"key": b, "label": VARIANTS[b]["label"], "exit_code": rc_b, "stats": stats_b},
             "delta": delta,
         }
+        cs.set_status("DONE")
 
         # optional: append both to CSV for traceability
         append_csv(benchmark, vars_, clauses, a, VARIANTS[a]["label"], stats_a)
         append_csv(benchmark, vars_, clauses, b, VARIANTS[b]["label"], stats_b)
 
     except Exception as e:
-        compares[compare_id]["status"] = "ERROR"
-        compares[compare_id]["log"] += f"\n[server error] {e}\n"
+        cs.append_log(f"\n[server error] {e}\n")
+        cs.set_status("ERROR")
 
 
 # ========= Routes =========
@@ -328,13 +639,15 @@ def list_variants():
 
 @app.get("/api/benchmarks")
 def list_benchmarks():
-    cnfs = sorted([f for f in os.listdir(APP_DIR) if f.endswith(".cnf")])
     items = []
-    for f in cnfs:
-        path = os.path.join(APP_DIR, f)
-        vars_, clauses = parse_dimacs_header(path)
-        size = os.path.getsize(path)
-        items.append({"name": f, "vars": vars_, "clauses": clauses, "bytes": size})
+    with os.scandir(APP_DIR) as it:
+        for e in it:
+            if not (e.name.endswith(".cnf") and e.is_file()):
+                continue
+            st = e.stat()
+            vars_, clauses = parse_dimacs_header(e.path, st)
+            items.append({"name": e.name, "vars": vars_, "clauses": clauses, "bytes": st.st_size})
+    items.sort(key=lambda x: x["name"])
     return {"benchmarks": items}
 
 @app.post("/api/build/{variant_key}")
@@ -345,89 +658,90 @@ def build_variant(variant_key: str, force: bool = Query(False)):
     return {"ok": True, "variant": variant_key}
 
 @app.post("/api/run/{benchmark}")
-def start_run(benchmark: str, variant: str = Query("baseline")):
+def start_run(benchmark: str, variant: str = Query("baseline"), pin: Optional[int] = Query(None, ge=0)):
     cnf_path = os.path.join(APP_DIR, benchmark)
-    if not os.path.exists(cnf_path):
+    try:
+        st = os.stat(cnf_path)  # also the header cache key, see parse_dimacs_header
+    except OSError:
         return JSONResponse({"error": "Benchmark inexistent."}, status_code=404)
 
     if variant not in VARIANTS:
         return JSONResponse({"error": "Variant invalid."}, status_code=400)
+    pin_err = check_pin(pin)
+    if pin_err:
+        return JSONResponse({"error": pin_err}, status_code=400)
 
     run_id = str(uuid.uuid4())
-    vars_, clauses = parse_dimacs_header(cnf_path)
-
-    runs[run_id] = {
-        "status": "RUNNING",
-        "log": "",
-        "stats": None,
-        "meta": {
-            "benchmark": benchmark,
-            "vars": vars_,
-            "clauses": clauses,
-            "variant_key": variant,
-            "variant_label": VARIANTS[variant]["label"],
-            "started_at": time.time(),
-        },
-    }
+    vars_, clauses = parse_dimacs_header(cnf_path, st)
 
-    t = threading.Thread(
-        target=run_task,
-        args=(run_id, variant, benchmark, cnf_path, vars_, clauses),
-        daemon=True
-    )
-    t.start()
+    runs[run_id] = RunState(meta={
+        "benchmark": benchmark,
+        "vars": vars_,
+        "clauses": clauses,
+        "variant_key": variant,
+        "variant_label": VARIANTS[variant]["label"],
+        "pin": pin,
+        "started_at": time.time(),
+    })
+
+    submit_job(run_task, run_id, variant, benchmark, cnf_path, vars_, clauses, pin)
 
     return {"run_id": run_id}
 
 @app.get("/api/run/{run_id}")
-def poll_run(run_id: str):
-    if run_id not in runs:
+def poll_run(run_id: str, request: Request, since: Optional[int] = Query(None, ge=0)):
+    rs = runs.get(run_id)
+    if rs is None:
         return JSONResponse({"error": "run_id invalid."}, status_code=404)
-    return runs[run_id]
+    return poll_response(rs, request, since)
 
 @app.post("/api/compare/{benchmark}")
 def start_compare(
     benchmark: str,
     a: str = Query("baseline"),
     b: str = Query("variant2"),
+    parallel: bool = Query(True),
+    pin: Optional[int] = Query(None, ge=0),
 ):
     cnf_path = os.path.join(APP_DIR, benchmark)
-    if not os.path.exists(cnf_path):
+    try:
+        st = os.stat(cnf_path)  # also the header cache key, see parse_dimacs_header
+    except OSError:
         return JSONResponse({"error": "Benchmark inexistent."}, status_code=404)
     if a not in VARIANTS or b not in VARIANTS:
         return JSONResponse({"error": "Variant invalid (a/b)."}, status_code=400)
+    pin_err = check_pin(pin)
+    if not pin_err and parallel and pin is not None and check_pin(pin + 1):
+        pin_err = (f"Compare paralel cu pin={pin} necesită CPU-urile {pin} și {pin + 1}; "
+                   f"folosește parallel=0 pentru a rula ambele variante pe CPU {pin}.")
+    if pin_err:
+        return JSONResponse({"error": pin_err}, status_code=400)
 
     compare_id = str(uuid.uuid4())
-    vars_, clauses = parse_dimacs_header(cnf_path)
-
-    compares[compare_id] = {
-        "status": "QUEUED",
-        "log": "",
-        "meta": {
-            "benchmark": benchmark,
-            "vars": vars_,
-            "clauses": clauses,
-            "a": a,
-            "b": b,
-            "started_at": time.time(),
-        },
-        "result": None,
-    }
+    vars_, clauses = parse_dimacs_header(cnf_path, st)
 
-    t = threading.Thread(
-        target=compare_task,
-        args=(compare_id, benchmark, cnf_path, vars_, clauses, a, b),
-        daemon=True
-    )
-    t.start()
+    compares[compare_id] = CompareState(meta={
+        "benchmark": benchmark,
+        "vars": vars_,
+        "clauses": clauses,
+        "a": a,
+        "b": b,
+        "parallel": parallel,
+        "pin": pin,
+        "started_at": time.time(),
+    })
+
+    submit_job(compare_task, compare_id, benchmark, cnf_path, vars_, clauses, a, b, parallel, pin)
 
     return {"compare_id": compare_id}
 
 @app.get("/api/compare/{compare_id}")
-def poll_compare(compare_id: str):
-    if compare_id not in compares:
+def poll_compare(compare_id: str, request: Request):
+    # no ?since here: in parallel mode A's section grows in the middle of the log
+    cs = compares.get(compare_id)
+    if cs is None:
         return JSONResponse({"error": "compare_id invalid."}, status_code=404)
-    return compares[compare_id]
+    return poll_response(cs, request)
 
 @app.get("/api/results.csv")
 def download_csv():
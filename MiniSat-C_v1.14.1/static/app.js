@@ -219,12 +219,21 @@ async function runBenchmark(b){
 
   const runId = start.run_id;
 
+  // incremental polling: only the new log tail (since=), 304 when unchanged
+  let log = "", logLen = 0, etag = null;
   while(true){
-    const rr = await fetch(`/api/run/${runId}`);
+    const rr = await fetch(`/api/run/${runId}?since=${logLen}`, etag ? { headers: { "If-None-Match": etag } } : {});
+    if(rr.status === 304){
+      await new Promise(res => setTimeout(res, 200));
+      continue;
+    }
+    etag = rr.headers.get("ETag");
     const state = await rr.json();
+    log += state.log_delta || "";
+    logLen = state.log_len ?? logLen;
 
     logEl.classList.remove("empty");
-    logEl.textContent = state.log || "";
+    logEl.textContent = log;
     logEl.scrollTop = logEl.scrollHeight;
 
     if(state.status === "DONE"){
@@ -266,8 +275,14 @@ async function compareBenchmark(b){
 
   const compareId = start.compare_id;
 
+  let etag = null;
   while(true){
-    const rr = await fetch(`/api/compare/${compareId}`);
+    const rr = await fetch(`/api/compare/${compareId}`, etag ? { headers: { "If-None-Match": etag } } : {});
+    if(rr.status === 304){
+      await new Promise(res => setTimeout(res, 250));
+      continue;
+    }
+    etag = rr.headers.get("ETag");
     const state = await rr.json();
 
     // show combined logs